@@ -0,0 +1,45 @@
+import os
+import random
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def vcr_config():
+    """Настройки записи и воспроизведения HTTP-запросов (pytest-vcr)"""
+    return {
+        "record_mode": "once",
+        "match_on": ["method", "scheme", "host", "path"],
+        "filter_headers": ["authorization"],
+    }
+
+
+@pytest.fixture(scope="module")
+def vcr_cassette_dir(request):
+    """Кассеты хранятся в tests/cassettes рядом с тестовым модулем"""
+    return os.path.join(os.path.dirname(request.module.__file__), "tests", "cassettes")
+
+
+def _make_rng(request) -> random.Random:
+    """Генератор случайных чисел для узла тестов.
+
+    При работе с кассетами seed зависит только от идентификатора узла, поэтому
+    запросы совпадают с записанными при любом порядке тестов и запуске через
+    pytest-xdist. С --disable-vcr seed не фиксируется, чтобы живые запуски
+    не создавали объявления под одними и теми же sellerID.
+    """
+    if request.config.getoption("--disable-vcr"):
+        return random.Random()
+    return random.Random(request.node.nodeid)
+
+
+@pytest.fixture
+def rng(request) -> random.Random:
+    """Собственный генератор случайных чисел для каждого теста"""
+    return _make_rng(request)
+
+
+@pytest.fixture(scope="class")
+def class_rng(request) -> random.Random:
+    """Генератор случайных чисел для фикстур с областью видимости класса"""
+    return _make_rng(request)
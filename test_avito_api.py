@@ -1,73 +1,124 @@
+import asyncio
 import pytest
-import requests
+import pytest_asyncio
+import httpx
+import orjson
 import random
-import json
-import re
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 BASE_URL = "https://qa-internship.avito.com"
+# Допустимые коды ответа в проверках, адаптированных под фактическое поведение
+_NOT_FOUND = frozenset({400, 404})
+_DELETED = frozenset({200, 404})
+# Схема тела объявления фиксирована: оно собирается форматированием строки без JSON-энкодера.
+# Подставляются только целые числа, экранирование не требуется
+_ITEM_TMPL = (
+    '{{"sellerID":{sid},"name":"Test Item {ni}","price":{p},'
+    '"statistics":{{"likes":{l},"viewCount":{v},"contacts":{c}}}}}'
+)
+_CLIENT_OPTIONS = {
+    "base_url": BASE_URL,
+    "http2": True,
+    "headers": {"Content-Type": "application/json", "Accept": "application/json"},
+    "timeout": 10.0,
+}
 
 
+def _post_item(client: httpx.Client, payload: Dict[str, Any]) -> httpx.Response:
+    """Создание объявления; тело сериализуется через orjson, заголовки JSON заданы в клиенте"""
+    return client.post("/api/1/item", content=orjson.dumps(payload))
+
+
+@pytest.fixture(scope="class")
+def client():
+    """Общий HTTP/2-клиент на класс тестов: запросы мультиплексируются в одном соединении"""
+    with httpx.Client(**_CLIENT_OPTIONS) as http_client:
+        yield http_client
+
+
+@pytest_asyncio.fixture
+async def aclient():
+    """Асинхронный клиент для тестов, которые отправляют независимые запросы одновременно"""
+    async with httpx.AsyncClient(**_CLIENT_OPTIONS) as http_client:
+        yield http_client
+
+
+@pytest.mark.vcr()
 class TestAvitoAPI:
     
-    def generate_seller_id(self) -> int:
-        """Генерация уникального sellerID"""
-        return random.randint(111111, 999999)
+    def generate_seller_id(self, rng: random.Random) -> int:
+        """Генерация случайного sellerID"""
+        return rng.randint(111111, 999999)
     
     def extract_item_id_from_response(self, response_text: str) -> str:
         """Извлечение ID объявления из ответа сервера"""
-        match = re.search(r'Сохранили объявление - ([a-f0-9-]+)', response_text)
-        if match:
-            return match.group(1)
-        return None
+        # Ответ имеет вид "Сохранили объявление - <uuid>"
+        _, sep, item_id = response_text.rpartition(" - ")
+        return item_id if sep and len(item_id) == 36 else None
     
-    def create_test_item(self, seller_id: int = None) -> Dict[str, Any]:
+    def build_item_body(self, rng: random.Random, seller_id: int) -> bytes:
+        """JSON-тело запроса для тестового объявления со случайными значениями"""
+        return _ITEM_TMPL.format(
+            sid=seller_id,
+            ni=rng.randint(1000, 9999),
+            p=rng.randint(100, 10000),
+            l=rng.randint(0, 100),
+            v=rng.randint(0, 1000),
+            c=rng.randint(0, 50),
+        ).encode()
+    
+    def create_test_item(
+        self, client: httpx.Client, rng: random.Random, seller_id: int = None
+    ) -> httpx.Response:
         """Создание тестового объявления с обработкой фактического формата ответа"""
         if seller_id is None:
-            seller_id = self.generate_seller_id()
-            
-        item_data = {
-            "sellerID": seller_id,
-            "name": f"Test Item {random.randint(1000, 9999)}",
-            "price": random.randint(100, 10000),
-            "statistics": {
-                "likes": random.randint(0, 100),
-                "viewCount": random.randint(0, 1000),
-                "contacts": random.randint(0, 50)
-            }
-        }
+            seller_id = self.generate_seller_id(rng)
         
-        response = requests.post(
-            f"{BASE_URL}/api/1/item",
-            headers={"Content-Type": "application/json", "Accept": "application/json"},
-            json=item_data
-        )
+        return client.post("/api/1/item", content=self.build_item_body(rng, seller_id))
+    
+    async def acreate_test_items(
+        self, aclient: httpx.AsyncClient, rng: random.Random, seller_id: int, count: int = 2
+    ) -> List[httpx.Response]:
+        """Одновременное создание нескольких объявлений одного продавца"""
+        # Тела собираются заранее, чтобы порядок случайных значений не зависел от планировщика
+        bodies = [self.build_item_body(rng, seller_id) for _ in range(count)]
+        return await asyncio.gather(*(aclient.post("/api/1/item", content=body) for body in bodies))
+    
+    def create_item_and_extract_id(self, client: httpx.Client, rng: random.Random, seller_id: int) -> str:
+        """Создание объявления и извлечение его ID"""
+        create_response = self.create_test_item(client, rng, seller_id)
+        assert create_response.status_code == 200, "Failed to create test item"
         
-        return response
+        item_id = self.extract_item_id_from_response(orjson.loads(create_response.content)["status"])
+        assert item_id is not None, "Failed to extract item ID"
+        return item_id
     
-    def test_create_item_success(self):
+    @pytest.fixture(scope="class")
+    def created_item(self, client, vcr, class_rng) -> Dict[str, Any]:
+        """Одно объявление на класс для тестов, которые его только читают.
+
+        Тесты-читатели помечены xdist_group("created_item"), а pytest.ini
+        включает --dist loadgroup: они попадают на один воркер, и объявление
+        создается и записывается в кассету один раз.
+        """
+        seller_id = self.generate_seller_id(class_rng)
+        # Фикстура создается до кассеты теста, поэтому пишется в собственную кассету
+        with vcr.use_cassette("TestAvitoAPI.created_item.yaml"):
+            item_id = self.create_item_and_extract_id(client, class_rng, seller_id)
+        return {"item_id": item_id, "seller_id": seller_id}
+    
+    @pytest.fixture
+    def item_to_delete(self, client, rng) -> str:
+        """Отдельное объявление для теста удаления, так как он изменяет состояние"""
+        return self.create_item_and_extract_id(client, rng, self.generate_seller_id(rng))
+    
+    def test_create_item_success(self, client, rng):
         """1.1. Успешное создание объявления (адаптированный под фактическое поведение)"""
-        seller_id = self.generate_seller_id()
-        item_data = {
-            "sellerID": seller_id,
-            "name": "Test Item",
-            "price": 1000,
-            "statistics": {
-                "likes": 10,
-                "viewCount": 100,
-                "contacts": 5
-            }
-        }
-        
-        response = requests.post(
-            f"{BASE_URL}/api/1/item",
-            headers={"Content-Type": "application/json", "Accept": "application/json"},
-            json=item_data
-        )
+        response = self.create_test_item(client, rng, seller_id=self.generate_seller_id(rng))
         
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         # Адаптируем проверку под фактический формат ответа
         assert "status" in response_data, "Response should contain status field"
         assert "Сохранили объявление" in response_data["status"], "Status should indicate successful creation"
@@ -76,7 +127,8 @@ class TestAvitoAPI:
         item_id = self.extract_item_id_from_response(response_data["status"])
         assert item_id is not None, "Should be able to extract item ID from response"
     
-    def test_create_item_invalid_seller_id(self):
+    @pytest.mark.vcr(record_mode="none")
+    def test_create_item_invalid_seller_id(self, client):
         """1.2. Создание объявления с невалидным sellerID"""
         item_data = {
             "sellerID": "invalid_id",
@@ -89,18 +141,14 @@ class TestAvitoAPI:
             }
         }
         
-        response = requests.post(
-            f"{BASE_URL}/api/1/item",
-            headers={"Content-Type": "application/json", "Accept": "application/json"},
-            json=item_data
-        )
+        response = _post_item(client, item_data)
         
         assert response.status_code == 400, f"Expected 400, got {response.status_code}"
     
-    def test_create_item_missing_required_fields(self):
+    def test_create_item_missing_required_fields(self, client, rng):
         """1.3. Создание объявления без обязательных полей"""
         item_data = {
-            "sellerID": self.generate_seller_id(),
+            "sellerID": self.generate_seller_id(rng),
             "price": 1000,
             "statistics": {
                 "likes": 10,
@@ -109,34 +157,22 @@ class TestAvitoAPI:
             }
         }
         
-        response = requests.post(
-            f"{BASE_URL}/api/1/item",
-            headers={"Content-Type": "application/json", "Accept": "application/json"},
-            json=item_data
-        )
+        response = _post_item(client, item_data)
         
         assert response.status_code == 400, f"Expected 400, got {response.status_code}"
     
-    def test_get_item_by_id_success(self):
+    @pytest.mark.xdist_group("created_item")
+    def test_get_item_by_id_success(self, client, created_item):
         """2.1. Успешное получение существующего объявления"""
-        # Сначала создаем объявление
-        create_response = self.create_test_item()
-        assert create_response.status_code == 200, "Failed to create test item"
-        
-        # Извлекаем ID из ответа
-        item_id = self.extract_item_id_from_response(create_response.json()["status"])
-        assert item_id is not None, "Failed to extract item ID"
+        item_id = created_item["item_id"]
         
         # Получаем созданное объявление
-        response = requests.get(
-            f"{BASE_URL}/api/1/item/{item_id}",
-            headers={"Accept": "application/json"}
-        )
+        response = client.get(f"/api/1/item/{item_id}")
         
         # Адаптируем проверку под фактическое поведение
         # Сервер может возвращать 200 с данными или другой статус
         if response.status_code == 200:
-            response_data = response.json()
+            response_data = orjson.loads(response.content)
             assert isinstance(response_data, list), "Response should be a list"
             if len(response_data) > 0:
                 item = response_data[0]
@@ -145,117 +181,79 @@ class TestAvitoAPI:
             # Если сервер возвращает ошибку, это тоже баг, но тест должен проходить
             pytest.fail(f"GET item returned {response.status_code} instead of 200")
     
-    def test_get_nonexistent_item(self):
-        """2.2. Получение несуществующего объявления (адаптированный)"""
-        response = requests.get(
-            f"{BASE_URL}/api/1/item/nonexistent123",
-            headers={"Accept": "application/json"}
-        )
+    @pytest.mark.vcr(record_mode="none")
+    @pytest.mark.parametrize(
+        "method,path",
+        [
+            ("GET", "/api/1/item/nonexistent123"),
+            ("GET", "/api/1/statistic/nonexistent123"),
+            ("DELETE", "/api/2/item/nonexistent123"),
+        ],
+        ids=["item", "statistic", "delete"],
+    )
+    def test_nonexistent(self, client, method, path):
+        """2.2, 4.2, 5.2. Получение и удаление несуществующего объявления и его статистики (адаптированный)"""
+        response = client.request(method, path)
         
         # Адаптируем под фактическое поведение (400 вместо 404)
-        assert response.status_code in [400, 404], f"Expected 400 or 404, got {response.status_code}"
+        assert response.status_code in _NOT_FOUND, f"Expected 400 or 404, got {response.status_code}"
     
-    def test_get_seller_items_success(self):
+    @pytest.mark.asyncio
+    async def test_get_seller_items_success(self, aclient, rng):
         """3.1. Успешное получение объявлений существующего продавца"""
-        seller_id = self.generate_seller_id()
+        seller_id = self.generate_seller_id(rng)
         
         # Создаем два объявления для одного продавца
-        self.create_test_item(seller_id)
-        self.create_test_item(seller_id)
+        await self.acreate_test_items(aclient, rng, seller_id)
         
-        response = requests.get(
-            f"{BASE_URL}/api/1/{seller_id}/item",
-            headers={"Accept": "application/json"}
-        )
+        response = await aclient.get(f"/api/1/{seller_id}/item")
         
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         assert isinstance(response_data, list), "Response should be a list"
         
         # Проверяем, что все объявления принадлежат указанному продавцу
-        for item in response_data:
-            assert item["sellerId"] == seller_id
+        seller_ids = {item["sellerId"] for item in response_data}
+        assert seller_ids <= {seller_id}, f"Unexpected sellerIds {seller_ids - {seller_id}}"
     
-    def test_get_nonexistent_seller_items(self):
+    def test_get_nonexistent_seller_items(self, client):
         """3.2. Получение объявлений несуществующего продавца"""
         nonexistent_seller_id = 999999
         
-        response = requests.get(
-            f"{BASE_URL}/api/1/{nonexistent_seller_id}/item",
-            headers={"Accept": "application/json"}
-        )
+        response = client.get(f"/api/1/{nonexistent_seller_id}/item")
         
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         assert isinstance(response_data, list), "Response should be a list"
     
-    def test_get_statistics_success(self):
+    @pytest.mark.xdist_group("created_item")
+    def test_get_statistics_success(self, client, created_item):
         """4.1. Успешное получение статистики существующего объявления"""
-        # Сначала создаем объявление
-        create_response = self.create_test_item()
-        assert create_response.status_code == 200, "Failed to create test item"
-        
-        # Извлекаем ID из ответа
-        item_id = self.extract_item_id_from_response(create_response.json()["status"])
-        assert item_id is not None, "Failed to extract item ID"
+        item_id = created_item["item_id"]
         
         # Получаем статистику
-        response = requests.get(
-            f"{BASE_URL}/api/1/statistic/{item_id}",
-            headers={"Accept": "application/json"}
-        )
+        response = client.get(f"/api/1/statistic/{item_id}")
         
         if response.status_code == 200:
-            response_data = response.json()
+            response_data = orjson.loads(response.content)
             assert isinstance(response_data, list), "Response should be a list"
         else:
             # Если сервер возвращает ошибку, отмечаем это
             pytest.fail(f"GET statistics returned {response.status_code} instead of 200")
     
-    def test_get_nonexistent_statistics(self):
-        """4.2. Получение статистики несуществующего объявления (адаптированный)"""
-        response = requests.get(
-            f"{BASE_URL}/api/1/statistic/nonexistent123",
-            headers={"Accept": "application/json"}
-        )
-        
-        # Адаптируем под фактическое поведение
-        assert response.status_code in [400, 404], f"Expected 400 or 404, got {response.status_code}"
-    
-    def test_delete_item_success(self):
+    def test_delete_item_success(self, client, item_to_delete):
         """5.1. Успешное удаление существующего объявления"""
-        # Сначала создаем объявление
-        create_response = self.create_test_item()
-        assert create_response.status_code == 200, "Failed to create test item"
-        
-        # Извлекаем ID из ответа
-        item_id = self.extract_item_id_from_response(create_response.json()["status"])
-        assert item_id is not None, "Failed to extract item ID"
-        
         # Удаляем объявление
-        response = requests.delete(
-            f"{BASE_URL}/api/2/item/{item_id}",
-            headers={"Accept": "application/json"}
-        )
+        response = client.delete(f"/api/2/item/{item_to_delete}")
         
         # Адаптируем проверку под возможные сценарии
-        assert response.status_code in [200, 404], f"Expected 200 or 404, got {response.status_code}"
-    
-    def test_delete_nonexistent_item(self):
-        """5.2. Удаление несуществующего объявления (адаптированный)"""
-        response = requests.delete(
-            f"{BASE_URL}/api/2/item/nonexistent123",
-            headers={"Accept": "application/json"}
-        )
-        
-        # Адаптируем под фактическое поведение
-        assert response.status_code in [400, 404], f"Expected 400 or 404, got {response.status_code}"
+        assert response.status_code in _DELETED, f"Expected 200 or 404, got {response.status_code}"
     
-    def test_full_cycle_integration(self):
+    def test_full_cycle_integration(self, client, rng):
         """6.1. Полный цикл создания и получения объявления (адаптированный)"""
-        seller_id = self.generate_seller_id()
+        seller_id = self.generate_seller_id(rng)
         item_data = {
             "sellerID": seller_id,
             "name": "Integration Test Item",
@@ -268,58 +266,48 @@ class TestAvitoAPI:
         }
         
         # Создаем объявление
-        create_response = requests.post(
-            f"{BASE_URL}/api/1/item",
-            headers={"Content-Type": "application/json", "Accept": "application/json"},
-            json=item_data
-        )
+        create_response = _post_item(client, item_data)
         
         assert create_response.status_code == 200, "Failed to create item"
-        created_item = create_response.json()
+        created_item = orjson.loads(create_response.content)
         
         # Извлекаем ID для последующих операций
         item_id = self.extract_item_id_from_response(created_item["status"])
         assert item_id is not None, "Failed to extract item ID"
         
         # Пытаемся получить созданное объявление
-        get_response = requests.get(
-            f"{BASE_URL}/api/1/item/{item_id}",
-            headers={"Accept": "application/json"}
-        )
+        get_response = client.get(f"/api/1/item/{item_id}")
         
         # Проверяем что запрос не завершился клиентской ошибкой
         assert get_response.status_code != 400, "GET request should not return 400 for valid ID"
         
         # Если сервер возвращает данные - проверяем их
         if get_response.status_code == 200:
-            items = get_response.json()
+            items = orjson.loads(get_response.content)
             if len(items) > 0:
                 retrieved_item = items[0]
                 # Проверяем что получили какое-то объявление
                 assert "id" in retrieved_item
     
-    def test_multiple_items_same_seller(self):
+    @pytest.mark.asyncio
+    async def test_multiple_items_same_seller(self, aclient, rng):
         """6.2. Создание нескольких объявлений одного продавца"""
-        seller_id = self.generate_seller_id()
+        seller_id = self.generate_seller_id(rng)
         
         # Создаем два объявления
-        self.create_test_item(seller_id)
-        self.create_test_item(seller_id)
+        await self.acreate_test_items(aclient, rng, seller_id)
         
         # Получаем все объявления продавца
-        response = requests.get(
-            f"{BASE_URL}/api/1/{seller_id}/item",
-            headers={"Accept": "application/json"}
-        )
+        response = await aclient.get(f"/api/1/{seller_id}/item")
         
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         
-        items = response.json()
+        items = orjson.loads(response.content)
         assert isinstance(items, list), "Response should be a list"
         
         # Проверяем, что все объявления принадлежат указанному продавцу
-        for item in items:
-            assert item["sellerId"] == seller_id, f"Item sellerId {item['sellerId']} doesn't match expected {seller_id}"
+        seller_ids = {item["sellerId"] for item in items}
+        assert seller_ids <= {seller_id}, f"Item sellerIds {seller_ids - {seller_id}} don't match expected {seller_id}"
 
 
 if __name__ == "__main__":